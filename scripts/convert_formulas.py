@@ -6,15 +6,147 @@ Identifies mathematical formulas in text and converts them to LaTeX format
 for use in QMD documents with $ (inline) or $$ (block) delimiters.
 """
 
+import copy
 import re
+from typing import Iterable, List, Tuple
+
+# Conversion rules as (pattern, replacement, flags, literal), applied in order.
+# A rule with a literal is its own pass and only runs when the literal occurs
+# in the text. Consecutive rules without one are fused into a single
+# alternation pass, so they must never compete for the same characters; a
+# rule whose match can cover text another rule needs gets a literal and its
+# own pass instead.
+FORMULA_RULES = [
+    # IC50 notation - most common in OECD docs
+    (r'\bIC\s*[-_]?\s*50\b', r'IC$_{50}$', re.IGNORECASE, '50'),
+    (r'\bIC\s*\(\s*50\s*\)', r'IC$_{50}$', re.IGNORECASE, '50'),
+
+    # Chemical formulas
+    (r'\bCO2\b', r'CO$_2$', 0, 'CO2'),
+    (r'\bH2O\b', r'H$_2$O', 0, 'H2O'),
+    (r'\bO2\b', r'O$_2$', 0, 'O2'),
+
+    # Concentration units
+    (r'(\d+)\s*µg/mL', r'\1~µg/mL', 0, 'µg/mL'),
+    (r'(\d+)\s*mM\b', r'\1~mM', 0, 'mM'),
+    (r'(\d+)\s*µM\b', r'\1~µM', 0, 'µM'),
+
+    # Temperature
+    (r'(\d+)\s*°\s*C\b', r'\1~°C', 0, '°'),
+    (r'37\s*0\s*C', r'37°C', 0, '37'),
+
+    # Dose notation
+    (r'(\d+)\s*J/cm2\b', r'\1~J/cm$^2$', 0, 'J/cm2'),
+    (r'(\d+)\s*mW/cm2\b', r'\1~mW/cm$^2$', 0, 'mW/cm2'),
+
+    # Time notation
+    (r'(\d+)\s*h\b', r'\1~h', 0, None),
+    (r'(\d+)\s*min\b', r'\1~min', 0, None),
+
+    # Wavelengths
+    (r'(\d+)\s*nm\b', r'\1~nm', 0, None),
+
+    # Ratios with colon
+    (r'(\d+)\s*:\s*(\d+)', r'\1:\2', 0, ':'),
+
+    # Percentages
+    (r'(\d+)\s*%', r'\1\\%', 0, None),
+
+    # Superscript notation like 2+
+    (r'(\d+)\s*\+\s*', r'\1$^+$', 0, None),
+
+    # Subscripts in chemical notation
+    (r'([A-Z][a-z]?)\s*_\s*(\d+)', r'\1$_{\2}$', 0, '_'),
+]
+
+# Separator for batched lines; must not be matched by \s, \w or \d
+LINE_SEPARATOR = '\x00'
+
+# Numbered group reference (\1, \2, ...) in a replacement template
+_GROUP_REF = re.compile(r'\\(\d+)')
+
+
+def _fuse_rules(rules: List[Tuple[str, str, int]]):
+    """
+    Fuse rules into one alternation pattern with a replacement function.
+
+    Args:
+        rules: (pattern, replacement, flags) of rules that never compete
+            for the same characters
+
+    Returns:
+        (compiled pattern, replacement function) for pattern.sub()
+    """
+    alternatives = []
+    for i, (pattern, _, flags) in enumerate(rules):
+        if flags & re.IGNORECASE:
+            pattern = f'(?i:{pattern})'
+        alternatives.append(f'(?P<g{i}>{pattern})')
+    fused = re.compile('|'.join(alternatives))
+
+    # Replacement templates, with group references shifted to the
+    # position of each rule's groups inside the fused pattern
+    repls = {}
+    for i, (_, replacement, _) in enumerate(rules):
+        base = fused.groupindex[f'g{i}']
+        repls[f'g{i}'] = _GROUP_REF.sub(
+            lambda m, base=base: f'\\g<{base + int(m.group(1))}>', replacement)
+
+    def dispatch(match: re.Match) -> str:
+        """Expand the replacement of whichever rule produced the match."""
+        return match.expand(repls[match.lastgroup])
+
+    return fused, dispatch
 
 
 class FormulaConverter:
     """Convert text-based formulas to LaTeX format."""
 
     def __init__(self):
-        """Initialize the formula converter with common patterns."""
-        pass
+        """Initialize the formula converter with precompiled patterns."""
+        # Passes as (literal, pattern, replacement), in rule order; a pass
+        # with a literal is skipped when the literal is absent. Runs of
+        # generic rules (literal None) become one fused pass each.
+        self._passes = []
+        generic = []
+        for pattern, replacement, flags, literal in FORMULA_RULES:
+            if literal is None:
+                generic.append((pattern, replacement, flags))
+                continue
+            if generic:
+                self._passes.append((None, *_fuse_rules(generic)))
+                generic = []
+            self._passes.append((literal, re.compile(pattern, flags), replacement))
+        if generic:
+            self._passes.append((None, *_fuse_rules(generic)))
+
+    def restricted_to(self, lines: Iterable[str]) -> 'FormulaConverter':
+        """
+        Copy this converter, keeping only the rules that can match the text.
+
+        The text is read one line at a time, so an open file can be passed
+        without loading it into memory; reading stops once every literal
+        has been seen. The compiled patterns are shared with this
+        converter, so a single instance can be specialized for many
+        documents without recompiling.
+
+        Args:
+            lines: Text that will be converted, as an iterable of lines
+
+        Returns:
+            Converter holding only the rules that can match the text
+        """
+        # Literals not seen yet; none contains a line break, so checking
+        # each line is the same as checking the whole text
+        unseen = {literal for literal, _, _ in self._passes if literal is not None}
+        for line in lines:
+            if not unseen:
+                break
+            unseen = {literal for literal in unseen if literal not in line}
+
+        converter = copy.copy(self)
+        converter._passes = [rule for rule in self._passes if rule[0] not in unseen]
+        return converter
 
     def convert_inline_formulas(self, text: str) -> str:
         """
@@ -26,59 +158,30 @@ class FormulaConverter:
         Returns:
             Text with formulas converted to LaTeX
         """
-        result = text
-
-        # IC50 notation - most common in OECD docs
-        result = re.sub(r'\bIC\s*[-_]?\s*50\b', r'IC$_{50}$', result, flags=re.IGNORECASE)
-        result = re.sub(r'\bIC\s*\(\s*50\s*\)', r'IC$_{50}$', result, flags=re.IGNORECASE)
-
-        # Chemical formulas
-        result = re.sub(r'\bCO2\b', r'CO$_2$', result)
-        result = re.sub(r'\bH2O\b', r'H$_2$O', result)
-        result = re.sub(r'\bO2\b', r'O$_2$', result)
-
-        # PIF and MPE notation
-        result = re.sub(r'\bPIF\b', r'PIF', result)
-        result = re.sub(r'\bMPE\b', r'MPE', result)
-
-        # UV notation
-        result = re.sub(r'\bUVA\b', r'UVA', result)
-        result = re.sub(r'\bUVB\b', r'UVB', result)
-        result = re.sub(r'\bUVC\b', r'UVC', result)
+        for literal, pattern, replacement in self._passes:
+            if literal is None or literal in text:
+                text = pattern.sub(replacement, text)
+        return text
 
-        # Concentration units
-        result = re.sub(r'(\d+)\s*µg/mL', r'\1~µg/mL', result)
-        result = re.sub(r'(\d+)\s*mM\b', r'\1~mM', result)
-        result = re.sub(r'(\d+)\s*µM\b', r'\1~µM', result)
-
-        # Temperature
-        result = re.sub(r'(\d+)\s*°\s*C\b', r'\1~°C', result)
-        result = re.sub(r'37\s*0\s*C', r'37°C', result)
-
-        # Dose notation
-        result = re.sub(r'(\d+)\s*J/cm2\b', r'\1~J/cm$^2$', result)
-        result = re.sub(r'(\d+)\s*mW/cm2\b', r'\1~mW/cm$^2$', result)
-
-        # Time notation
-        result = re.sub(r'(\d+)\s*h\b', r'\1~h', result)
-        result = re.sub(r'(\d+)\s*min\b', r'\1~min', result)
-
-        # Wavelengths
-        result = re.sub(r'(\d+)\s*nm\b', r'\1~nm', result)
-
-        # Ratios with colon
-        result = re.sub(r'(\d+)\s*:\s*(\d+)', r'\1:\2', result)
-
-        # Percentages
-        result = re.sub(r'(\d+)\s*%', r'\1\\%', result)
+    def convert_lines(self, lines: List[str]) -> List[str]:
+        """
+        Convert many lines with a single pass over one joined buffer.
 
-        # Superscript notation like 2+
-        result = re.sub(r'(\d+)\s*\+\s*', r'\1$^+$', result)
+        Lines are joined with a NUL separator, which is neither whitespace
+        nor a word character, so no rule can match across a line boundary
+        and each line converts exactly as it would on its own. Input that
+        already contains a NUL cannot be split back apart safely, so it is
+        converted line by line instead.
 
-        # Subscripts in chemical notation
-        result = re.sub(r'([A-Z][a-z]?)\s*_\s*(\d+)', r'\1$_{\2}$', result)
+        Args:
+            lines: Input lines containing formulas
 
-        return result
+        Returns:
+            Converted lines, in the same order
+        """
+        if any(LINE_SEPARATOR in line for line in lines):
+            return [self.convert_inline_formulas(line) for line in lines]
+        return self.convert_inline_formulas(LINE_SEPARATOR.join(lines)).split(LINE_SEPARATOR)
 
 
 def main():
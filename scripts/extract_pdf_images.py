@@ -6,17 +6,151 @@ Extracts images and table screenshots from PDF pages.
 Skips page 1, filters solid black/white images, and saves to images/ folder.
 """
 
+import io
+import math
 import pdfplumber
 import fitz  # PyMuPDF
 import numpy as np
 from PIL import Image
-import io
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import List, Dict, Tuple, Any
+from typing import List, Dict, Tuple, Any, Optional, Union
+
+try:
+    import numba
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+
+if HAS_NUMBA:
+    @njit(parallel=True, cache=True, boundscheck=False, fastmath=True)
+    def _image_stats(arr):
+        """
+        Collect all is_solid_color statistics in a single pass over the pixels.
+
+        Args:
+            arr: C-contiguous uint8 RGB array of shape (height, width, 3)
+
+        Returns:
+            Tuple of (sum, sum of squares, element count, non-white count,
+            edge pixel count)
+        """
+        h, w, c = arr.shape
+        total = 0
+        total_sq = 0
+        non_white = 0
+        edges = 0
+        for i in prange(h):
+            for j in range(w):
+                for k in range(c):
+                    v = np.int64(arr[i, j, k])
+                    total += v
+                    total_sq += v * v
+                    if v < 230:
+                        non_white += 1
+
+                # Gradient edge count on the grayscale image; grayscale and
+                # gradients stay in registers instead of full-image arrays
+                if i < h - 1 and j < w - 1:
+                    g = (np.int32(arr[i, j, 0]) + arr[i, j, 1] + arr[i, j, 2]) // 3
+                    g_right = (np.int32(arr[i, j + 1, 0]) + arr[i, j + 1, 1] + arr[i, j + 1, 2]) // 3
+                    g_down = (np.int32(arr[i + 1, j, 0]) + arr[i + 1, j, 1] + arr[i + 1, j, 2]) // 3
+                    gx = abs(g - g_right)
+                    gy = abs(g - g_down)
+                    if max(gx, gy) > 15:
+                        edges += 1
+        return total, total_sq, h * w * c, non_white, edges
+
+
+class SolidColorAnalyzer:
+    """
+    Edge detection for the NumPy fallback with reusable scratch buffers.
 
+    The grayscale, gradient and mask arrays are kept between calls and
+    only grown when a larger image arrives, so checking many images does
+    not allocate fresh full-size arrays for each one.
+    """
+
+    def __init__(self):
+        """Start with empty buffers; they grow on first use."""
+        self._buf_gray = np.empty(0, dtype=np.int16)
+        self._buf_gx = np.empty(0, dtype=np.int16)
+        self._buf_gy = np.empty(0, dtype=np.int16)
+        self._buf_mask = np.empty(0, dtype=bool)
+
+    @staticmethod
+    def _view(buf: np.ndarray, shape: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (buffer, contiguous view of the given shape), growing the buffer if needed."""
+        size = shape[0] * shape[1]
+        if buf.size < size:
+            buf = np.empty(size, dtype=buf.dtype)
+        return buf, buf[:size].reshape(shape)
+
+    def edge_ratio(self, img_array: np.ndarray) -> float:
+        """
+        Fraction of edge pixels using a simple gradient (Sobel-like) detector.
+
+        Args:
+            img_array: RGB or grayscale image array
+
+        Returns:
+            Ratio of pixels whose gradient magnitude exceeds 15
+        """
+        h, w = img_array.shape[:2]
+        self._buf_gray, gray = self._view(self._buf_gray, (h, w))
+        self._buf_gx, gx = self._view(self._buf_gx, (h - 1, w - 1))
+        self._buf_gy, gy = self._view(self._buf_gy, (h - 1, w - 1))
+        self._buf_mask, mask = self._view(self._buf_mask, (h - 1, w - 1))
+
+        # Convert to grayscale for edge detection; an integer channel sum
+        # gives the same truncated mean as np.mean without a float64 array
+        if len(img_array.shape) == 3:
+            np.add(img_array[..., 0], img_array[..., 1], out=gray, dtype=np.int16)
+            np.add(gray, img_array[..., 2], out=gray)
+            np.floor_divide(gray, 3, out=gray)
+        else:
+            np.copyto(gray, img_array.astype(np.uint8, copy=False))
+
+        # Calculate gradients in x and y directions
+        np.subtract(gray[:-1, :-1], gray[:-1, 1:], out=gx)
+        np.abs(gx, out=gx)
+        np.subtract(gray[:-1, :-1], gray[1:, :-1], out=gy)
+        np.abs(gy, out=gy)
+        np.maximum(gx, gy, out=gx)
+
+        # Count edge pixels (gradients > 15)
+        np.greater(gx, 15, out=mask)
+        return np.count_nonzero(mask) / mask.size
+
+
+# Shared analyzer for is_solid_color; each worker process has its own
+_solid_analyzer = SolidColorAnalyzer()
+
+
+def pixmap_to_rgb_array(pix: fitz.Pixmap) -> np.ndarray:
+    """
+    Convert a PyMuPDF pixmap to an RGB numpy array.
+
+    Args:
+        pix: Pixmap in any colorspace, with or without alpha
+
+    Returns:
+        uint8 array of shape (height, width, 3)
+    """
+    if pix.n - pix.alpha != 3:
+        pix = fitz.Pixmap(fitz.csRGB, pix)
+    if pix.alpha:
+        pix = fitz.Pixmap(pix, 0)
 
-def is_solid_color(image: Image.Image, variance_threshold: float = 1.0,
+    # Copy out of the pixmap buffer, which is freed with the pixmap
+    return np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, 3)
+
+
+def is_solid_color(image: Union[Image.Image, np.ndarray], variance_threshold: float = 1.0,
                    black_threshold: int = 15, white_threshold: int = 240,
                    use_edge_detection: bool = True) -> Tuple[bool, str]:
     """
@@ -26,7 +160,7 @@ def is_solid_color(image: Image.Image, variance_threshold: float = 1.0,
     handling of scientific charts and graphs with white backgrounds.
 
     Args:
-        image: PIL Image to check
+        image: PIL Image or RGB uint8 array to check
         variance_threshold: Maximum variance for solid color (default 1.0)
         black_threshold: Max avg pixel value for black (default 15)
         white_threshold: Min avg pixel value for white (default 240)
@@ -35,22 +169,52 @@ def is_solid_color(image: Image.Image, variance_threshold: float = 1.0,
     Returns:
         Tuple of (is_solid, reason)
     """
-    # Convert to RGB if needed
-    if image.mode != 'RGB':
-        image = image.convert('RGB')
-
-    # Convert to numpy array
-    img_array = np.array(image)
+    if isinstance(image, np.ndarray):
+        img_array = image
+    else:
+        # Convert to RGB if needed
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+
+        # Convert to numpy array
+        img_array = np.array(image)
+
+    # ===== Fast path: a pixel sample already proves the variance =====
+    # Any subset's spread bounds the full variance from below (scaled by
+    # subset size), so a varied sample settles Layer 1 without a full
+    # pass; ink is then counted exactly, so the answer matches Layer 2.
+    # The stride is kept coprime with the width so samples do not stay
+    # in the same few columns.
+    step = 64
+    while math.gcd(step, img_array.shape[1]) != 1:
+        step += 1
+    sample = img_array.reshape(-1, 3)[::step]
+    non_white_ratio = None
+    if sample.var() * sample.size > variance_threshold * img_array.size:
+        non_white_ratio = np.count_nonzero(img_array < 230) / img_array.size
+        if non_white_ratio > 0.05:
+            return False, f"Valid content ({non_white_ratio*100:.1f}% non-white)"
+
+    if HAS_NUMBA:
+        # Single fused pass; every layer below reads from these values
+        total, total_sq, n, non_white, edges = _image_stats(np.ascontiguousarray(img_array))
+        avg_pixel = total / n
+        variance = max(total_sq / n - avg_pixel * avg_pixel, 0.0)
+        non_white_ratio = non_white / n
+        edge_area = (img_array.shape[0] - 1) * (img_array.shape[1] - 1)
+        edge_ratio = edges / edge_area if edge_area > 0 else 0.0
+    else:
+        variance = np.var(img_array)
 
     # ===== Layer 1: Basic variance check =====
-    variance = np.var(img_array)
     if variance < variance_threshold:
         return True, f"Low variance ({variance:.4f} < {variance_threshold})"
 
     # ===== Layer 2: Content density analysis =====
     # Calculate non-white pixel ratio (more lenient threshold)
     # Scientific charts often have < 20% ink (lines, text, data points)
-    non_white_ratio = np.sum(img_array < 230) / img_array.size
+    if not HAS_NUMBA and non_white_ratio is None:
+        non_white_ratio = np.sum(img_array < 230) / img_array.size
 
     # If image has substantial content (> 5%), it's likely valid
     if non_white_ratio > 0.05:
@@ -58,28 +222,16 @@ def is_solid_color(image: Image.Image, variance_threshold: float = 1.0,
 
     # ===== Layer 3: Edge detection for scientific charts =====
     if use_edge_detection:
-        # Convert to grayscale for edge detection
-        if len(img_array.shape) == 3:
-            gray = np.mean(img_array, axis=2).astype(np.uint8)
-        else:
-            gray = img_array.astype(np.uint8)
-
-        # Simple gradient-based edge detection (Sobel-like)
-        # Calculate gradients in x and y directions
-        gradient_x = np.abs(gray[:-1, :-1].astype(np.int16) - gray[:-1, 1:].astype(np.int16))
-        gradient_y = np.abs(gray[:-1, :-1].astype(np.int16) - gray[1:, :-1].astype(np.int16))
-        gradient_magnitude = np.maximum(gradient_x, gradient_y)
-
-        # Count edge pixels (gradients > 15)
-        edge_pixels = np.sum(gradient_magnitude > 15)
-        edge_ratio = edge_pixels / gradient_magnitude.size
+        if not HAS_NUMBA:
+            edge_ratio = _solid_analyzer.edge_ratio(img_array)
 
         # If significant edges detected (> 1%), it's likely a chart/graph
         if edge_ratio > 0.01:
             return False, f"Has edges ({edge_ratio*100:.1f}% edge pixels)"
 
     # ===== Layer 4: Color range check (final filter) =====
-    avg_pixel = np.mean(img_array)
+    if not HAS_NUMBA:
+        avg_pixel = np.mean(img_array)
     if avg_pixel < black_threshold:
         return True, f"Solid black (avg={avg_pixel:.2f} < {black_threshold})"
 
@@ -93,15 +245,163 @@ def is_solid_color(image: Image.Image, variance_threshold: float = 1.0,
     return False, f"Valid image (avg={avg_pixel:.1f}, content={non_white_ratio*100:.1f}%)"
 
 
+def plumber_bbox_to_rect(page: fitz.Page, bbox: Tuple[float, float, float, float]) -> fitz.Rect:
+    """
+    Map a pdfplumber bounding box onto PyMuPDF page coordinates.
+
+    pdfplumber measures from the top-left of the rotated MediaBox, while
+    PyMuPDF pages start at the top-left of the rotated CropBox, so a
+    cropped or rotated page needs both frames undone.
+
+    Args:
+        page: PyMuPDF page the box belongs to
+        bbox: pdfplumber (x0, top, x1, bottom)
+
+    Returns:
+        Rectangle suitable as a get_pixmap clip
+    """
+    # Undo the page rotation applied to the whole MediaBox
+    rotate = fitz.Matrix(page.rotation)
+    frame = fitz.Rect(0, 0, page.mediabox.width, page.mediabox.height) * rotate
+    unrotate = ~(rotate * fitz.Matrix(1, 0, 0, 1, -frame.x0, -frame.y0))
+
+    # Shift to the CropBox origin, then rotate into page coordinates
+    offset = page.cropbox_position
+    crop = fitz.Matrix(1, 0, 0, 1, -offset.x, -offset.y)
+    return fitz.Rect(bbox) * unrotate * crop * page.rotation_matrix
+
+
+def _process_page(pdf_doc: fitz.Document, pdf_plumber: pdfplumber.PDF, page_index: int,
+                  images_path: Path, variance_threshold: float) -> Dict[str, Any]:
+    """
+    Extract images and table screenshots from a single page.
+
+    Valid images are saved under page-specific names (for example
+    ``_p2_figure_1.png``) so pages can be processed independently; the
+    caller renames them to their final sequential names.
+
+    Args:
+        pdf_doc: Open PyMuPDF document
+        pdf_plumber: Open pdfplumber document
+        page_index: 0-based page index
+        images_path: Directory to save extracted images
+        variance_threshold: Variance threshold for solid color filtering
+
+    Returns:
+        Dictionary with saved file names and filtered items for the page
+    """
+    page_num = page_index + 1
+    plumber_page = pdf_plumber.pages[page_index]
+
+    figures = []
+    tables = []
+    filtered_images = []
+    filtered_tables = []
+
+    # Extract regular images using PyMuPDF
+    image_list = pdf_doc[page_index].get_images(full=True)
+    for img_index, img in enumerate(image_list):
+        # Decode straight into a pixmap; no PIL round-trip is needed
+        pix = fitz.Pixmap(pdf_doc, img[0])
+        if pix.colorspace is None:
+            # Stencil masks (/ImageMask) have no colorspace to convert
+            # from; decode the stored image with PIL instead
+            image = Image.open(io.BytesIO(pdf_doc.extract_image(img[0])["image"]))
+        else:
+            if pix.colorspace.n not in (1, 3):
+                # CMYK, indexed etc. cannot be written as PNG
+                pix = fitz.Pixmap(fitz.csRGB, pix)
+            image = pixmap_to_rgb_array(pix)
+
+        # Check if solid color (with edge detection enabled)
+        is_solid, reason = is_solid_color(image, variance_threshold,
+                                         use_edge_detection=True)
+
+        if is_solid:
+            filtered_images.append({
+                'page': page_num,
+                'image_index': img_index,
+                'reason': reason
+            })
+            continue
+
+        # Save valid image
+        image_filename = images_path / f"_p{page_num}_figure_{len(figures) + 1}.png"
+        if isinstance(image, Image.Image):
+            image.save(image_filename, 'PNG')
+        else:
+            pix.save(image_filename)
+        figures.append(image_filename.name)
+
+    # Detect tables with pdfplumber, render screenshots with PyMuPDF
+    for table_index, table in enumerate(plumber_page.find_tables()):
+        # Get table bounding box
+        bbox = table.bbox  # (x0, top, x1, bottom)
+
+        page = pdf_doc[page_index]
+        pix = page.get_pixmap(clip=plumber_bbox_to_rect(page, bbox), dpi=300)  # High resolution
+
+        # Check if solid color (with edge detection enabled)
+        is_solid, reason = is_solid_color(pixmap_to_rgb_array(pix), variance_threshold,
+                                         use_edge_detection=True)
+
+        if is_solid:
+            filtered_tables.append({
+                'page': page_num,
+                'table_index': table_index,
+                'reason': reason
+            })
+            continue
+
+        # Save valid table screenshot
+        table_filename = images_path / f"_p{page_num}_table_{len(tables) + 1}.png"
+        pix.save(table_filename)
+        tables.append(table_filename.name)
+
+    return {
+        'page': page_num,
+        'figures': figures,
+        'tables': tables,
+        'filtered_images': filtered_images,
+        'filtered_tables': filtered_tables
+    }
+
+
+# Documents opened once per worker process (fitz documents can't be pickled)
+_worker_docs = None
+
+
+def _init_worker(pdf_path: str) -> None:
+    """Open the PDF in a worker process and keep it for all its pages."""
+    global _worker_docs
+    _worker_docs = (fitz.open(pdf_path), pdfplumber.open(pdf_path))
+    if HAS_NUMBA:
+        # Pages already run in parallel; avoid oversubscribing the cores
+        numba.set_num_threads(1)
+
+
+def _process_page_in_worker(page_index: int, images_dir: str,
+                            variance_threshold: float) -> Dict[str, Any]:
+    """Process one page using the worker's open documents."""
+    pdf_doc, pdf_plumber = _worker_docs
+    return _process_page(pdf_doc, pdf_plumber, page_index, Path(images_dir),
+                         variance_threshold)
+
+
 def extract_images_and_tables(pdf_path: str, images_dir: str,
-                              variance_threshold: float = 1.0) -> Dict[str, Any]:
+                              variance_threshold: float = 1.0,
+                              max_workers: Optional[int] = None) -> Dict[str, Any]:
     """
     Extract images and table screenshots from PDF.
 
+    Pages are processed in parallel worker processes when there are more
+    than two of them.
+
     Args:
         pdf_path: Path to input PDF file
         images_dir: Directory to save extracted images
         variance_threshold: Variance threshold for solid color filtering
+        max_workers: Number of worker processes (default: CPU count)
 
     Returns:
         Dictionary with extraction metadata
@@ -109,86 +409,49 @@ def extract_images_and_tables(pdf_path: str, images_dir: str,
     images_path = Path(images_dir)
     images_path.mkdir(exist_ok=True)
 
-    # Open PDF with both libraries
-    pdf_doc = fitz.open(pdf_path)
-    pdf_plumber = pdfplumber.open(pdf_path)
+    with fitz.open(pdf_path) as pdf_doc:
+        page_count = len(pdf_doc)
+
+    # Process pages (skip page 1, start from page 2 which is index 1)
+    page_indices = range(1, page_count)
+
+    if len(page_indices) <= 2:
+        # Open PDF with both libraries
+        with fitz.open(pdf_path) as pdf_doc, pdfplumber.open(pdf_path) as pdf_plumber:
+            page_results = [_process_page(pdf_doc, pdf_plumber, page_index, images_path,
+                                          variance_threshold)
+                            for page_index in page_indices]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(pdf_path,)) as executor:
+            page_results = list(executor.map(
+                partial(_process_page_in_worker, images_dir=str(images_path),
+                        variance_threshold=variance_threshold),
+                page_indices))
 
     figure_count = 0
     table_count = 0
     filtered_images = []
     filtered_tables = []
 
-    # Process pages (skip page 1, start from page 2 which is index 1)
-    for page_num in range(1, len(pdf_doc)):
-        page_index = page_num  # fitz uses 0-based index
-        plumber_page = pdf_plumber.pages[page_index]
-
-        print(f"Processing page {page_num + 1}...")
-
-        # Extract regular images using PyMuPDF
-        image_list = pdf_doc[page_index].get_images(full=True)
-        for img_index, img in enumerate(image_list):
-            base_image = pdf_doc.extract_image(img[0])
-            image_bytes = base_image["image"]
-
-            # Convert to PIL Image
-            pil_image = Image.open(io.BytesIO(image_bytes))
-
-            # Check if solid color (with edge detection enabled)
-            is_solid, reason = is_solid_color(pil_image, variance_threshold,
-                                             use_edge_detection=True)
-
-            if is_solid:
-                filtered_images.append({
-                    'page': page_num + 1,
-                    'image_index': img_index,
-                    'reason': reason
-                })
-                continue
-
-            # Save valid image
+    # Number the saved files sequentially in page order
+    for result in page_results:
+        print(f"Processing page {result['page']}...")
+
+        for name in result['figures']:
             figure_count += 1
             image_filename = images_path / f"figure_{figure_count}.png"
-            pil_image.save(image_filename, 'PNG')
+            (images_path / name).replace(image_filename)
             print(f"  ✅ Saved: {image_filename.name}")
 
-        # Extract tables as screenshots using pdfplumber
-        tables = plumber_page.find_tables()
-
-        for table_index, table in enumerate(tables):
-            # Get table bounding box
-            bbox = table.bbox  # (x0, top, x1, bottom)
-
-            # Crop the page region containing the table
-            # pdfplumber bbox is (x0, top, x1, bottom)
-            # We need to use pdfplumber's crop method
-            table_crop = plumber_page.crop(bbox)
-
-            # Convert to PIL Image
-            table_image = table_crop.to_image(resolution=300)  # High resolution
-            pil_table_image = table_image.original
-
-            # Check if solid color (with edge detection enabled)
-            is_solid, reason = is_solid_color(pil_table_image, variance_threshold,
-                                             use_edge_detection=True)
-
-            if is_solid:
-                filtered_tables.append({
-                    'page': page_num + 1,
-                    'table_index': table_index,
-                    'reason': reason
-                })
-                continue
-
-            # Save valid table screenshot
+        for name in result['tables']:
             table_count += 1
             table_filename = images_path / f"table_{table_count}.png"
-            pil_table_image.save(table_filename, 'PNG')
+            (images_path / name).replace(table_filename)
             print(f"  ✅ Saved table: {table_filename.name}")
 
-    # Close PDFs
-    pdf_doc.close()
-    pdf_plumber.close()
+        filtered_images.extend(result['filtered_images'])
+        filtered_tables.extend(result['filtered_tables'])
 
     return {
         'figures_extracted': figure_count,
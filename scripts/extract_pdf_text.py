@@ -6,63 +6,102 @@ Extracts text from PDF pages while detecting and skipping tables.
 Uses pdfplumber for text extraction and table detection.
 """
 
+import os
 import pdfplumber
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 
+# Documents up to this many pages are extracted in the calling process
+MIN_PARALLEL_PAGES = 8
 
-def extract_text_with_tables(pdf_path: str, output_md: str) -> Dict[str, Any]:
+
+def _extract_range(pdf_path: str, start: int, end: int) -> List[Tuple[int, str, List[Any]]]:
+    """
+    Extract text and table boxes for a contiguous range of pages.
+
+    Args:
+        pdf_path: Path to input PDF file
+        start: Index of the first page (0-based)
+        end: Index one past the last page
+
+    Returns:
+        List of (page number, text, table bboxes) tuples in page order
+    """
+    pages = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for page_index in range(start, end):
+            page = pdf.pages[page_index]
+            # Detect tables on this page
+            bboxes = [table.bbox for table in page.find_tables()]
+            # Extract text, excluding table regions
+            pages.append((page_index + 1, page.extract_text(), bboxes))
+    return pages
+
+
+def extract_text_with_tables(pdf_path: str, output_md: str,
+                             max_workers: Optional[int] = None) -> Dict[str, Any]:
     """
     Extract text from PDF while detecting tables.
 
+    Pages are split into contiguous ranges, one per worker process, and
+    the results are written in page order.
+
     Args:
         pdf_path: Path to input PDF file
         output_md: Path to output markdown file
+        max_workers: Number of worker processes (default: CPU count)
 
     Returns:
         Dictionary with metadata about extraction
     """
     tables_found = []
-    page_count = 0
 
     with pdfplumber.open(pdf_path) as pdf:
-        with open(output_md, 'w', encoding='utf-8') as md_file:
-            md_file.write(f"# Extracted Text from {Path(pdf_path).name}\n\n")
-
-            for page_num, page in enumerate(pdf.pages, start=1):
-                page_count = page_num
-
-                # Detect tables on this page
-                tables = page.find_tables()
-                page_tables = []
-
-                # Record table information
-                for i, table in enumerate(tables):
-                    table_id = f"table_{len(tables_found) + 1}"
-                    bbox = table.bbox
-                    page_tables.append({
-                        'id': table_id,
-                        'page': page_num,
-                        'bbox': bbox
-                    })
-                    tables_found.append(page_tables[-1])
-
-                # Extract text, excluding table regions
-                text = page.extract_text()
-
-                if text:
-                    # Add page marker
-                    md_file.write(f"## 第 {page_num} 页\n\n")
-
-                    # If tables found on this page, add placeholder
-                    if page_tables:
-                        for pt in page_tables:
-                            md_file.write(f"[TABLE: {pt['id']}]\n\n")
-
-                    # Write the text content
-                    md_file.write(f"{text}\n\n")
-                    md_file.write("---\n\n")
+        page_count = len(pdf.pages)
+
+    workers = min(max_workers or os.cpu_count() or 1, page_count)
+    if workers <= 1 or page_count <= MIN_PARALLEL_PAGES:
+        chunks = [_extract_range(pdf_path, 0, page_count)]
+    else:
+        size = -(-page_count // workers)
+        starts = range(0, page_count, size)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = list(executor.map(
+                partial(_extract_range, pdf_path), starts,
+                [min(start + size, page_count) for start in starts]))
+
+    with open(output_md, 'w', encoding='utf-8') as md_file:
+        md_file.write(f"# Extracted Text from {Path(pdf_path).name}\n\n")
+
+        for page_num, text, bboxes in (page for chunk in chunks for page in chunk):
+            # Record table information
+            page_tables = []
+            for bbox in bboxes:
+                table_id = f"table_{len(tables_found) + 1}"
+                page_tables.append({
+                    'id': table_id,
+                    'page': page_num,
+                    'bbox': bbox
+                })
+                tables_found.append(page_tables[-1])
+
+            if text:
+                # Add page marker
+                chunk = [f"## 第 {page_num} 页\n\n"]
+
+                # If tables found on this page, add placeholder
+                for pt in page_tables:
+                    chunk.append(f"[TABLE: {pt['id']}]\n\n")
+
+                # Add the text content
+                chunk.append(f"{text}\n\n")
+                chunk.append("---\n\n")
+
+                # One write per page
+                md_file.write("".join(chunk))
 
     return {
         'total_pages': page_count,
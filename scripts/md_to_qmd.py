@@ -6,10 +6,14 @@ Converts extracted markdown to structured QMD format with proper frontmatter,
 heading analysis, table placeholder processing, and formula conversion to LaTeX.
 """
 
+import io
 import re
 import sys
+import time
+from collections import deque
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional
 from datetime import datetime
 from convert_formulas import FormulaConverter
 
@@ -17,6 +21,41 @@ from convert_formulas import FormulaConverter
 # Default template path
 DEFAULT_TEMPLATE_PATH = Path(__file__).parent.parent / "assets" / "template.qmd"
 
+# Seconds a template's mtime is trusted before it is checked again
+TEMPLATE_STAT_TTL = 1.0
+
+# Template path -> (time of last stat, mtime)
+_TEMPLATE_STAT_CACHE: Dict[str, Tuple[float, float]] = {}
+
+# Common OECD section markers that start a heading line
+_HEADING_RE = re.compile(
+    r'^(?:INTRODUCTION|PRINCIPLE|DESCRIPTION|PREPARATION|PROCEDURE'
+    r'|DEFINITIONS|LITERATURE|ANNEX'
+    r'|Test conditions|Controls|Results|Discussion'
+    r'|Initial Consideration|Principle of the Test Method'
+    r'|Irradiation Conditions|Dosimetry|Interpretation'
+    r'|Evaluation of Results|Test Report)',
+    re.IGNORECASE
+)
+
+# Characters that end a sentence or clause rather than a heading
+_PUNCT_END = frozenset('.,;:')
+
+# Reference section heading
+_REF_PATTERN = re.compile(
+    r'^(#{1,3}\s*)?(Literature|References|参考文献|文献)$',
+    re.IGNORECASE
+)
+
+# Template placeholder such as {{TITLE}}
+_PLACEHOLDER_RE = re.compile(r'\{\{(\w+)\}\}')
+
+# Maximum number of lines converted in one batched formula pass
+FORMULA_BATCH_LINES = 512
+
+# Shared FormulaConverter, built on first use
+_FORMULA_CONVERTER = None
+
 
 def load_template(template_path: Optional[Path] = None) -> str:
     """
@@ -34,10 +73,26 @@ def load_template(template_path: Optional[Path] = None) -> str:
     if template_path is None:
         template_path = DEFAULT_TEMPLATE_PATH
 
-    if not template_path.exists():
-        raise FileNotFoundError(f"Template file not found: {template_path}")
-
-    with open(template_path, 'r', encoding='utf-8') as f:
+    # Re-stat a template at most once per TEMPLATE_STAT_TTL seconds
+    path_str = str(template_path)
+    now = time.monotonic()
+    cached = _TEMPLATE_STAT_CACHE.get(path_str)
+    if cached is not None and now - cached[0] < TEMPLATE_STAT_TTL:
+        mtime = cached[1]
+    else:
+        try:
+            mtime = template_path.stat().st_mtime
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Template file not found: {template_path}") from None
+        _TEMPLATE_STAT_CACHE[path_str] = (now, mtime)
+
+    return _load_template_cached(path_str, mtime)
+
+
+@lru_cache(maxsize=8)
+def _load_template_cached(path_str: str, mtime: float) -> str:
+    """Read a template file; the mtime key invalidates edited templates."""
+    with open(path_str, 'r', encoding='utf-8') as f:
         return f.read()
 
 
@@ -50,74 +105,127 @@ def fill_template(template: str, **kwargs) -> str:
         **kwargs: Key-value pairs for placeholder replacement
 
     Returns:
-        Filled template content
+        Filled template content; placeholders without a value are kept
     """
-    content = template
-    for key, value in kwargs.items():
-        placeholder = "{{" + key + "}}"
-        content = content.replace(placeholder, str(value))
-    return content
+    return _PLACEHOLDER_RE.sub(lambda m: str(kwargs.get(m.group(1), m.group(0))), template)
 
 
-def analyze_heading_quality(line: str, prev_line: str, next_line: str) -> Tuple[bool, str]:
+def analyze_heading_quality(line: str, prev_blank: bool, next_blank: bool) -> Tuple[bool, str]:
     """
     Analyze if a line should be a heading using multi-method approach.
 
     Args:
-        line: Current line to analyze
-        prev_line: Previous line
-        next_line: Next line
+        line: Current line to analyze, already stripped
+        prev_blank: Whether the previous line is blank
+        next_blank: Whether the next line is blank
 
     Returns:
         Tuple of (is_heading, heading_level)
     """
-    line = line.strip()
-
     # Skip empty lines
     if not line:
         return False, ""
 
     # Already a markdown heading
     if line.startswith('#'):
-        level = len(re.match(r'^#+', line).group())
+        level = len(line) - len(line.lstrip('#'))
         return True, f"{'#' * min(level, 6)} "
 
+    # Cheap length and punctuation tests come first; the word count is
+    # only taken for lines that pass them
+    line_len = len(line)
+    last = line[-1]
+
     # Method 1: Format analysis
     # Check for ALL CAPS short lines (common in OECD docs)
-    if len(line) < 100 and line.isupper() and not line.endswith('.'):
+    if line_len < 100 and last != '.' and line.isupper():
         # Likely a heading
         if len(line.split()) <= 10:  # Short phrases
             return True, "## "
 
     # Method 2: Content analysis
     # Check for common section markers
-    heading_patterns = [
-        r'^(INTRODUCTION|PRINCIPLE|DESCRIPTION|PREPARATION|PROCEDURE)',
-        r'^(DEFINITIONS|LITERATURE|ANNEX)',
-        r'^(Test conditions|Controls|Results|Discussion)',
-        r'^(Initial Consideration|Principle of the Test Method)',
-        r'^(Irradiation Conditions|Dosimetry|Interpretation)',
-        r'^(Evaluation of Results|Test Report)',
-    ]
-
-    for pattern in heading_patterns:
-        if re.match(pattern, line, re.IGNORECASE):
-            return True, "### "
+    if _HEADING_RE.match(line):
+        return True, "### "
 
-    # Check: Short lines without ending punctuation
-    if len(line) < 80 and not line.endswith(('.', ',', ';', ':')):
-        # Check context
-        words = line.split()
-        if 2 <= len(words) <= 8:  # Likely a heading
-            # Check if surrounded by blank lines
-            prev_blank = not prev_line.strip() or prev_line.strip() == ""
-            next_blank = not next_line.strip() or next_line.strip() == ""
-            if prev_blank or next_blank:
-                return True, "### "
+    # Check: Short lines without ending punctuation, next to a blank line
+    if (line_len < 80 and (prev_blank or next_blank)
+            and last not in _PUNCT_END):
+        # Likely a heading
+        if 2 <= len(line.split()) <= 8:
+            return True, "### "
 
     return False, ""
 
 
+def window(items: Iterable) -> Iterator[Tuple]:
+    """
+    Slide a three-item window over an iterable, such as an open file.
+
+    Args:
+        items: Items to iterate
+
+    Returns:
+        Iterator of (previous, current, next) tuples, with None in place
+        of the missing neighbour at either end
+    """
+    buf = deque([None], maxlen=3)
+    for item in items:
+        buf.append(item)
+        if len(buf) == 3:
+            yield tuple(buf)
+    if len(buf) > 1:
+        yield buf[-2], buf[-1], None
+
+
+class _StrippedWriter:
+    """
+    Stream text to a file as if the concatenated output had been strip()-ped.
+
+    Leading whitespace is dropped until the first non-blank text, and
+    trailing whitespace is held back until more text follows it.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._started = False
+        self._pending = ""
+
+    def write(self, text: str) -> None:
+        if not self._started:
+            text = text.lstrip()
+            if not text:
+                return
+            self._started = True
+
+        body = text.rstrip()
+        if body:
+            self.stream.write(self._pending)
+            self.stream.write(body)
+            self._pending = text[len(body):]
+        else:
+            self._pending += text
+
+
+def split_template(template: str) -> Optional[Tuple[str, str, str]]:
+    """
+    Split a template around its {{CONTENT}} and {{REFERENCES}} placeholders.
+
+    Args:
+        template: Template content
+
+    Returns:
+        Tuple of (head, middle, tail), or None if the template does not
+        contain each placeholder exactly once with content first
+    """
+    head, content_sep, rest = template.partition("{{CONTENT}}")
+    middle, references_sep, tail = rest.partition("{{REFERENCES}}")
+    if (not content_sep or not references_sep or "{{REFERENCES}}" in head
+            or "{{CONTENT}}" in rest or "{{REFERENCES}}" in tail):
+        return None
+    return head, middle, tail
+
+
 def convert_markdown_to_qmd(md_path: str, output_qmd: str,
                             title: str = "OECD Test Guideline",
                             doc_number: str = "XXX",
@@ -126,6 +234,10 @@ def convert_markdown_to_qmd(md_path: str, output_qmd: str,
     """
     Convert extracted markdown to QMD format with formula conversion.
 
+    The markdown is first read line by line to specialize the formula
+    converter, then again while the QMD is written as it is produced,
+    so the file is never held in memory whole.
+
     Args:
         md_path: Path to input markdown file
         output_qmd: Path to output QMD file
@@ -134,89 +246,117 @@ def convert_markdown_to_qmd(md_path: str, output_qmd: str,
         template_path: Optional path to custom template file
         publication_date: Original publication date from PDF
     """
-    # Initialize formula converter
-    formula_converter = FormulaConverter()
-
-    # Load template
-    template = load_template(template_path)
-
+    # Initialize formula converter with only the rules this document needs;
+    # the full converter is compiled once per process and reused
+    global _FORMULA_CONVERTER
+    if _FORMULA_CONVERTER is None:
+        _FORMULA_CONVERTER = FormulaConverter()
     with open(md_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-
-    # Process content
-    processed_lines = []
-    table_counter = 0
-    references_lines = []
-    in_references = False
-
-    # Pattern to detect reference section headings
-    ref_pattern = re.compile(
-        r'^(#{1,3}\s*)?(Literature|References|参考文献|文献)$',
-        re.IGNORECASE
-    )
-
-    for i, line in enumerate(lines):
-        prev_line = lines[i - 1] if i > 0 else ""
-        next_line = lines[i + 1] if i < len(lines) - 1 else ""
-
-        # Check if this is a references section heading
-        line_stripped = line.strip()
-        if ref_pattern.match(line_stripped):
-            in_references = True
-
-        # Process table placeholders
-        if '[TABLE:' in line:
-            table_counter += 1
-            table_id = f"table_{table_counter}"
-            if in_references:
-                references_lines.append(f"\n![表格 {table_counter}](images/{table_id}.png){{#tbl-{table_counter}}}\n\n")
-            else:
-                processed_lines.append(f"\n![表格 {table_counter}](images/{table_id}.png){{#tbl-{table_counter}}}\n\n")
-            continue
-
-        # Analyze and convert headings
-        is_heading, level = analyze_heading_quality(line_stripped,
-                                                     prev_line.strip(),
-                                                     next_line.strip())
-
-        if is_heading and not line_stripped.startswith('#'):
-            # Convert to heading
-            content = line_stripped
-            # Capitalize first letter of each word
-            content = ' '.join(word.capitalize() for word in content.split())
-            converted_line = f"{level}{content}\n\n"
-        else:
-            # Apply formula conversion to non-heading lines
-            converted_line = formula_converter.convert_inline_formulas(line)
-
-        # Add to appropriate section
-        # Skip the references heading itself from main content
-        if in_references and not ref_pattern.match(line_stripped):
-            references_lines.append(converted_line)
-        elif not in_references:
-            processed_lines.append(converted_line)
+        formula_converter = _FORMULA_CONVERTER.restricted_to(f)
 
-    # Prepare template variables
+    # Load template and fill everything except the document body
     today = datetime.now().strftime("%Y-%m-%d")
-    content = ''.join(processed_lines).strip()
-    references = ''.join(references_lines).strip() if references_lines else "参见原文末尾参考文献列表"
-
-    template_vars = {
-        'DOC_NUMBER': doc_number,
-        'TITLE': title,
-        'DATE': today,
-        'PUBLICATION_DATE': publication_date or "未知",
-        'CONTENT': content,
-        'REFERENCES': references,
-    }
-
-    # Fill template and write output
-    filled_template = fill_template(template, **template_vars)
-
-    with open(output_qmd, 'w', encoding='utf-8') as f:
-        f.write(filled_template)
+    template = fill_template(load_template(template_path),
+                             DOC_NUMBER=doc_number,
+                             TITLE=title,
+                             DATE=today,
+                             PUBLICATION_DATE=publication_date or "未知")
+
+    # Templates with one {{CONTENT}} followed by one {{REFERENCES}} are
+    # streamed; any other layout is buffered and filled at the end
+    layout = split_template(template)
+
+    with open(md_path, 'r', encoding='utf-8') as f, \
+            open(output_qmd, 'w', encoding='utf-8') as out:
+        if layout:
+            head, middle, tail = layout
+            out.write(head)
+            content_writer = _StrippedWriter(out)
+            references_writer = _StrippedWriter(out)
+        else:
+            content_writer = _StrippedWriter(io.StringIO())
+            references_writer = _StrippedWriter(io.StringIO())
+
+        line_count = 0
+        table_counter = 0
+        has_references = False
+        in_references = False
+
+        # Consecutive non-heading lines of the current section, converted
+        # together in one formula pass when the run ends
+        pending_lines = []
+
+        def flush_pending() -> None:
+            if pending_lines:
+                writer = references_writer if in_references else content_writer
+                writer.write(''.join(formula_converter.convert_lines(pending_lines)))
+                pending_lines.clear()
+
+        # Sliding window over (line, stripped line) pairs, so each line
+        # is stripped once; neighbours past either end count as blank
+        for prev, (line, line_stripped), nxt in window((l, l.strip()) for l in f):
+            line_count += 1
+
+            # Check if this is a references section heading
+            is_ref_heading = bool(_REF_PATTERN.match(line_stripped))
+            if is_ref_heading and not in_references:
+                flush_pending()
+                in_references = True
+                if layout:
+                    out.write(middle)
+
+            # Process table placeholders; most lines have no bracket at all
+            if '[' in line and '[TABLE:' in line:
+                flush_pending()
+                table_counter += 1
+                table_id = f"table_{table_counter}"
+                table_line = f"\n![表格 {table_counter}](images/{table_id}.png){{#tbl-{table_counter}}}\n\n"
+                if in_references:
+                    references_writer.write(table_line)
+                    has_references = True
+                else:
+                    content_writer.write(table_line)
+            else:
+                # Analyze and convert headings
+                is_heading, level = analyze_heading_quality(line_stripped,
+                                                             prev is None or not prev[1],
+                                                             nxt is None or not nxt[1])
+
+                # Skip the references heading itself from main content
+                if not (in_references and is_ref_heading):
+                    if in_references:
+                        has_references = True
+
+                    if is_heading and not line_stripped.startswith('#'):
+                        # Convert to heading
+                        content = line_stripped
+                        # Capitalize first letter of each word
+                        content = ' '.join([word.capitalize() for word in content.split()])
+                        flush_pending()
+                        writer = references_writer if in_references else content_writer
+                        writer.write(f"{level}{content}\n\n")
+                    else:
+                        # Queue non-heading lines for formula conversion
+                        pending_lines.append(line)
+                        if len(pending_lines) >= FORMULA_BATCH_LINES:
+                            flush_pending()
+
+        flush_pending()
+
+        if layout and not in_references:
+            out.write(middle)
+
+        if not has_references:
+            references_writer.write("参见原文末尾参考文献列表")
+
+        if layout:
+            out.write(tail)
+        else:
+            out.write(fill_template(template,
+                                    CONTENT=content_writer.stream.getvalue(),
+                                    REFERENCES=references_writer.stream.getvalue()))
 
-    print(f"✅ Processed {len(lines)} lines")
+    print(f"✅ Processed {line_count} lines")
     print(f"   - Tables referenced: {table_counter}")
     print(f"   - Output: {output_qmd}")
 
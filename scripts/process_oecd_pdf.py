@@ -8,24 +8,80 @@ QMD generation, translation, and cleanup.
 
 import sys
 import os
+import re
 import shutil
+import threading
 from pathlib import Path
+from typing import List, Tuple
 import subprocess
 
+# Three-digit guideline number in a filename (e.g. "OECD_432_..." -> "432")
+_DOC_NUM_RE = re.compile(r'(\d{3})')
+
+
+def _start_step(cmd: list) -> subprocess.Popen:
+    """Start a step with stdout and stderr merged into one line-buffered pipe."""
+    # Unbuffered so the Python scripts emit each line as it is printed
+    # instead of a block at exit
+    env = {**os.environ, 'PYTHONUNBUFFERED': '1'}
+    return subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            text=True, bufsize=1, env=env)
+
+
+def _finish_step(proc: subprocess.Popen, cmd: list) -> bool:
+    """Wait for a step whose output has been drained and report its status."""
+    returncode = proc.wait()
+    proc.stdout.close()
+    if returncode != 0:
+        print(f"❌ Error: {subprocess.CalledProcessError(returncode, cmd)}")
+        return False
+    return True
+
 
 def run_command(cmd: list, description: str) -> bool:
     """Run a command and return success status."""
     print(f"\n{'='*60}")
     print(f"Step: {description}")
     print(f"{'='*60}")
-    try:
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-        print(result.stdout)
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Error: {e}")
-        print(e.stderr)
-        return False
+    # Relay the child's output line by line as it runs
+    proc = _start_step(cmd)
+    for line in proc.stdout:
+        sys.stdout.write(line)
+    return _finish_step(proc, cmd)
+
+
+def run_commands_concurrently(commands: List[Tuple[list, str]]) -> List[bool]:
+    """
+    Run independent commands at the same time.
+
+    Each command's output is relayed by its own thread as it arrives, so
+    neither pipe can fill up and stall its process. Lines are prefixed
+    with the command's position, e.g. "[1] ", to keep them attributable.
+
+    Args:
+        commands: List of (command, description) pairs
+
+    Returns:
+        Success status of each command, in order
+    """
+    print(f"\n{'='*60}")
+    for _, description in commands:
+        print(f"Step: {description}")
+    print(f"{'='*60}")
+
+    def relay(stream, prefix: str) -> None:
+        for line in stream:
+            sys.stdout.write(prefix + line)
+
+    procs = [_start_step(cmd) for cmd, _ in commands]
+    relays = [threading.Thread(target=relay, args=(proc.stdout, f"[{i}] "))
+              for i, proc in enumerate(procs, start=1)]
+    for thread in relays:
+        thread.start()
+    for thread in relays:
+        thread.join()
+
+    return [_finish_step(proc, cmd) for proc, (cmd, _) in zip(procs, commands)]
 
 
 def process_oecd_pdf(pdf_path: str, output_dir: str = None,
@@ -64,8 +120,7 @@ def process_oecd_pdf(pdf_path: str, output_dir: str = None,
     # Extract document number and title from filename if not provided
     if doc_number is None:
         # Try to extract from filename (e.g., "OECD_432_..." -> "432")
-        import re
-        match = re.search(r'(\d{3})', pdf_path.name)
+        match = _DOC_NUM_RE.search(pdf_path.name)
         doc_number = match.group(1) if match else "XXX"
 
     if title is None:
@@ -79,27 +134,30 @@ def process_oecd_pdf(pdf_path: str, output_dir: str = None,
     english_qmd = output_dir / f"{pdf_path.stem}_英文.qmd"
     chinese_qmd = output_dir / f"{pdf_path.stem}_中文.qmd"
 
-    # Step 1: Extract text with table detection
-    success = run_command([
-        sys.executable,
-        str(scripts_dir / "extract_pdf_text.py"),
-        str(pdf_path),
-        str(extracted_md)
-    ], "1. Extract text from PDF (detecting tables)")
-
-    if not success:
+    # Steps 1 and 2 read the same PDF and write separate outputs, so they
+    # run concurrently
+    text_success, images_success = run_commands_concurrently([
+        # Step 1: Extract text with table detection
+        ([
+            sys.executable,
+            str(scripts_dir / "extract_pdf_text.py"),
+            str(pdf_path),
+            str(extracted_md)
+        ], "1. Extract text from PDF (detecting tables)"),
+        # Step 2: Extract images and tables
+        ([
+            sys.executable,
+            str(scripts_dir / "extract_pdf_images.py"),
+            str(pdf_path),
+            str(images_dir)
+        ], "2. Extract images and table screenshots"),
+    ])
+
+    if not text_success:
         print("❌ Failed to extract text")
         sys.exit(1)
 
-    # Step 2: Extract images and tables
-    success = run_command([
-        sys.executable,
-        str(scripts_dir / "extract_pdf_images.py"),
-        str(pdf_path),
-        str(images_dir)
-    ], "2. Extract images and table screenshots")
-
-    if not success:
+    if not images_success:
         print("❌ Failed to extract images/tables")
         sys.exit(1)
 
@@ -150,9 +208,11 @@ def process_oecd_pdf(pdf_path: str, output_dir: str = None,
     ]
 
     for file in files_to_remove:
-        if file.exists():
+        try:
             file.unlink()
-            print(f"  🗑️  Removed: {file.name}")
+        except FileNotFoundError:
+            continue
+        print(f"  🗑️  Removed: {file.name}")
 
     # Summary
     print(f"\n{'='*60}")
@@ -162,7 +222,9 @@ def process_oecd_pdf(pdf_path: str, output_dir: str = None,
     print(f"  📄 {english_qmd.name}")
     print(f"  📄 {chinese_qmd.name}")
     print(f"  📁 {images_dir.name}/")
-    print(f"\nTotal items in {images_dir.name}/: {len(list(images_dir.glob('*')))}")
+    with os.scandir(images_dir) as entries:
+        item_count = sum(1 for _ in entries)
+    print(f"\nTotal items in {images_dir.name}/: {item_count}")
 
     # Translation completion notice
     if translation_method == "claude-code":
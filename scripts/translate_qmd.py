@@ -6,11 +6,25 @@ Translates English QMD to Chinese with accurate toxicology terminology.
 Supports multiple translation APIs with Claude as primary method.
 """
 
+import hashlib
+import json
 import re
 import sys
 import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+# Optional Aho-Corasick automaton for single-pass glossary replacement
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
 
 
 # Terminology glossary with equal priority for all domains
@@ -98,6 +112,449 @@ TERMINOLOGY_GLOSSARY = {
 }
 
 
+# Glossary terms, longest first so phrases win over the words inside them
+_TERMS_SORTED = sorted(TERMINOLOGY_GLOSSARY.items(), key=lambda x: len(x[0]), reverse=True)
+
+# Lowercases ASCII only, keeping every character at its offset
+_ASCII_LOWER = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')
+
+
+def _replace_terms_sequentially(text: str, terms: List[Tuple[str, str]]) -> str:
+    """
+    Replace glossary terms one at a time as case-insensitive whole words.
+
+    Args:
+        text: Text to process
+        terms: (English, Chinese) pairs, applied in order
+
+    Returns:
+        Text with terms replaced
+    """
+    for en, zh in terms:
+        if en.lower() in text.lower():
+            pattern = re.compile(r'\b' + re.escape(en) + r'\b', re.IGNORECASE)
+            text = pattern.sub(zh, text)
+    return text
+
+
+def _is_word_boundary(text: str, pos: int) -> bool:
+    """Whether a regex \\b would match at pos in text."""
+    before = pos > 0 and (text[pos - 1].isalnum() or text[pos - 1] == '_')
+    after = pos < len(text) and (text[pos].isalnum() or text[pos] == '_')
+    return before != after
+
+
+# Final replacement for each term in _TERMS_SORTED. A replacement that
+# contains later terms (e.g. 'IC 50' -> 'IC50') is expanded the way
+# replacing one term after another would expand it.
+_REPLACEMENTS = [_replace_terms_sequentially(zh, _TERMS_SORTED[rank + 1:])
+                 for rank, (en, zh) in enumerate(_TERMS_SORTED)]
+
+def _build_trie() -> Dict:
+    """Build a character trie over the lowercased terms; a None key holds the term's rank."""
+    trie = {}
+    for rank, (en, _) in enumerate(_TERMS_SORTED):
+        node = trie
+        for ch in en.lower():
+            node = node.setdefault(ch, {})
+        node.setdefault(None, rank)
+    return trie
+
+
+_TERM_TRIE = _build_trie()
+
+# Word starts whose first letter begins some term; the only places the
+# trie scan needs to look. Lowercasing never changes whether a character
+# is a word character, so \b means the same in the lowered text.
+_TERM_START_RE = re.compile(r'\b[' + re.escape(''.join(sorted(_TERM_TRIE))) + ']')
+
+
+def _build_automaton():
+    """Build an Aho-Corasick automaton mapping each lowercased term to (rank, length, replacement)."""
+    automaton = ahocorasick.Automaton()
+    for rank, (en, _) in enumerate(_TERMS_SORTED):
+        key = en.lower()
+        if not automaton.exists(key):
+            automaton.add_word(key, (rank, len(en), _REPLACEMENTS[rank]))
+    automaton.make_automaton()
+    return automaton
+
+
+_AUTOMATON = _build_automaton() if HAS_AHOCORASICK else None
+
+
+def _scan_with_trie(text: str, lowered: str) -> str:
+    """
+    Replace terms in one left-to-right walk, taking the longest whole-word
+    term that starts at each candidate word start.
+
+    Args:
+        text: Text to process
+        lowered: Lowercased text with the same character offsets
+
+    Returns:
+        Text with terminology replaced
+    """
+    parts = []
+    pos = 0
+    n = len(text)
+    for match in _TERM_START_RE.finditer(lowered):
+        i = match.start()
+        if i < pos:
+            continue
+
+        # Follow the trie as far as the text allows, remembering the
+        # longest term that ends on a word boundary
+        node = _TERM_TRIE[lowered[i]]
+        best = None
+        j = i + 1
+        while True:
+            if None in node and _is_word_boundary(text, j):
+                best = (j, node[None])
+            if j == n:
+                break
+            node = node.get(lowered[j])
+            if node is None:
+                break
+            j += 1
+
+        if best is not None:
+            parts.append(text[pos:i])
+            parts.append(_REPLACEMENTS[best[1]])
+            pos = best[0]
+    parts.append(text[pos:])
+    return ''.join(parts)
+
+
+def _scan_with_automaton(text: str, lowered: str) -> str:
+    """
+    Replace terms found in one Aho-Corasick pass over the text.
+
+    Args:
+        text: Text to process
+        lowered: Lowercased text with the same character offsets
+
+    Returns:
+        Text with terminology replaced
+    """
+    # Whole-word hits, taken in the order the sequential passes would
+    # apply them: by term rank, then left to right
+    hits = []
+    for end, (rank, length, replacement) in _AUTOMATON.iter(lowered):
+        start = end + 1 - length
+        if _is_word_boundary(text, start) and _is_word_boundary(text, end + 1):
+            hits.append((rank, start, end + 1, replacement))
+    hits.sort()
+
+    taken = bytearray(len(text))
+    chosen = []
+    for rank, start, end, replacement in hits:
+        if taken.find(1, start, end) == -1:
+            taken[start:end] = b'\x01' * (end - start)
+            chosen.append((start, end, replacement))
+    chosen.sort()
+
+    parts = []
+    pos = 0
+    for start, end, replacement in chosen:
+        parts.append(text[pos:start])
+        parts.append(replacement)
+        pos = end
+    parts.append(text[pos:])
+    return ''.join(parts)
+
+
+def _apply_glossary(text: str) -> str:
+    """
+    Replace glossary terms in text (longer terms take precedence).
+
+    The text is scanned once and the output joined once, with an
+    Aho-Corasick automaton when pyahocorasick is installed and a
+    character trie otherwise. Both give the same result as replacing
+    one term after another, longest first.
+
+    Args:
+        text: Text to process
+
+    Returns:
+        Text with terminology replaced
+    """
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        lowered = text.translate(_ASCII_LOWER)
+
+    if _AUTOMATON is None:
+        return _scan_with_trie(text, lowered)
+    return _scan_with_automaton(text, lowered)
+
+
+# Terminology guide for the ClaudeTranslation prompt (first 50 terms)
+_GLOSSARY_STR_50 = "\n".join(f"  - {en}: {zh}"
+                              for en, zh in islice(TERMINOLOGY_GLOSSARY.items(), 50))
+
+# Key terminology for the AnthropicAPITranslation prompt (first 20 terms)
+_GLOSSARY_STR_20 = "\n".join(f"{en}: {zh}"
+                              for en, zh in islice(TERMINOLOGY_GLOSSARY.items(), 20))
+
+# Static part of every ClaudeTranslation prompt. It is sent as its own
+# content block marked for prompt caching, so it must not vary per call.
+_TRANSLATION_INSTRUCTIONS = f"""You are translating an OECD test guideline document from English to Chinese.
+
+IMPORTANT INSTRUCTIONS:
+1. Translate the FULL text to Chinese - do not leave any English text untranslated
+2. Use the following terminology glossary for consistent scientific translation:
+{_GLOSSARY_STR_50}
+3. Preserve all markdown formatting, including headings (#, ##, ###), bold (**), italics (*), links, and code blocks
+4. Keep all numeric values, units, chemical formulas, and abbreviations unchanged
+5. Maintain the original document structure and paragraph breaks
+6. For technical terms not in the glossary, use standard Chinese scientific terminology"""
+
+
+def _prompt_content(request: str) -> List[Dict[str, Any]]:
+    """
+    Build message content: the cached static instructions, then the request.
+
+    Args:
+        request: Per-call part of the prompt
+
+    Returns:
+        Content blocks for a user message
+    """
+    return [
+        {"type": "text", "text": _TRANSLATION_INSTRUCTIONS,
+         "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": request},
+    ]
+
+
+# Maximum characters of source text sent in one API call, so the
+# translated reply stays within max_tokens. Longer texts are split at
+# paragraph breaks.
+BATCH_MAX_CHARS = 12000
+
+# Largest max_tokens requested for one reply
+MAX_OUTPUT_TOKENS = 8192
+
+# Reply tokens requested per source character, with headroom for
+# Chinese output and JSON quoting
+OUTPUT_TOKENS_PER_CHAR = 0.6
+
+# Model used for ClaudeTranslation requests
+CLAUDE_MODEL = "claude-3-5-sonnet-20241022"
+
+# Bump when the ClaudeTranslation prompts change, so cached translations
+# made with the old prompts are not reused
+PROMPT_VERSION = "1"
+
+# On-disk cache of ClaudeTranslation results, one file per source text
+TRANSLATION_CACHE_DIR = Path.home() / '.cache' / 'oecd-translate'
+
+# Maximum API calls in flight at once, kept low to stay within rate limits
+MAX_CONCURRENT_REQUESTS = 8
+
+# Markdown code fence a model may wrap around a JSON reply
+_CODE_FENCE_RE = re.compile(r'^```(?:json)?\s*|\s*```$')
+
+
+def _cache_path(text: str) -> Path:
+    """Cache file for the translation of text under the current model and prompts."""
+    key = hashlib.sha256(f"{CLAUDE_MODEL}|{PROMPT_VERSION}|{text}".encode('utf-8')).hexdigest()
+    return TRANSLATION_CACHE_DIR / key[:2] / key
+
+
+def _read_cached(text: str) -> Optional[str]:
+    """
+    Look up a cached translation.
+
+    Args:
+        text: Source text
+
+    Returns:
+        Cached translation, or None on a miss
+    """
+    try:
+        return _cache_path(text).read_text(encoding='utf-8')
+    except OSError:
+        return None
+
+
+def _write_cached(text: str, translation: str) -> None:
+    """
+    Store a translation in the cache.
+
+    The file is written next to its final name and moved into place, so
+    concurrent writers and interrupted runs never leave a partial entry.
+    A cache that cannot be written is skipped silently.
+
+    Args:
+        text: Source text
+        translation: Its translation
+    """
+    path = _cache_path(text)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(translation)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        pass
+
+
+def _max_tokens_for(source_chars: int) -> int:
+    """Estimate the max_tokens a translation of source_chars characters needs."""
+    return min(MAX_OUTPUT_TOKENS, int(source_chars * OUTPUT_TOKENS_PER_CHAR) + 256)
+
+
+def _split_for_limit(text: str, max_chars: int) -> List[str]:
+    """
+    Split text at paragraph breaks into chunks of at most max_chars characters.
+
+    Blank paragraphs stay with the chunk before them (leading ones with the
+    first chunk), so no chunk is whitespace only, and a paragraph longer
+    than max_chars becomes a chunk of its own.
+
+    Args:
+        text: Text to split
+        max_chars: Character budget per chunk
+
+    Returns:
+        Chunks in order; joining them with blank lines gives text back
+    """
+    if len(text) <= max_chars:
+        return [text]
+
+    chunks = []
+    current = []
+    size = 0
+    has_content = False
+    for paragraph in text.split('\n\n'):
+        if has_content and paragraph.strip() and size + len(paragraph) > max_chars:
+            chunks.append('\n\n'.join(current))
+            current = []
+            size = 0
+            has_content = False
+        current.append(paragraph)
+        size += len(paragraph) + 2
+        has_content = has_content or bool(paragraph.strip())
+    chunks.append('\n\n'.join(current))
+    return chunks
+
+
+def _pack_batches(texts: List[str], max_chars: int) -> List[List[str]]:
+    """
+    Group consecutive texts into batches of at most max_chars characters.
+
+    A text longer than max_chars gets a batch of its own.
+
+    Args:
+        texts: Texts to group, in order
+        max_chars: Character budget per batch
+
+    Returns:
+        List of batches, preserving order
+    """
+    batches = []
+    batch = []
+    size = 0
+    for text in texts:
+        if batch and size + len(text) > max_chars:
+            batches.append(batch)
+            batch = []
+            size = 0
+        batch.append(text)
+        size += len(text)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _heading_end(body: str, start: int) -> Optional[int]:
+    """
+    Match a Markdown heading at a line start, as ^#{1,6}\s+.+$ would.
+
+    Args:
+        body: Text being split
+        start: Start of a line beginning with '#'
+
+    Returns:
+        End of the heading (its line break or the end of body), or None
+    """
+    n = len(body)
+    q = start
+    while q < n and body[q] == '#':
+        q += 1
+    if q - start > 6 or q == n or not body[q].isspace():
+        return None
+
+    # \s+ may run across line breaks; .+ then needs a character other
+    # than a line break, preferring the one furthest along
+    e = q + 1
+    while e < n and body[e].isspace():
+        e += 1
+    if e == n:
+        e -= 1
+        while e > q and body[e] == '\n':
+            e -= 1
+        if e == q:
+            return None
+
+    end = body.find('\n', e)
+    return n if end == -1 else end
+
+
+def _split_sections(body: str) -> List[str]:
+    """
+    Split body at Markdown headings, keeping each heading as its own item.
+
+    Gives the same list as re.split(r'(^#{1,6}\s+.+$)', body, flags=re.MULTILINE),
+    but only inspects lines that start with '#'.
+
+    Args:
+        body: Document body
+
+    Returns:
+        Alternating text and heading sections, starting and ending with text
+    """
+    sections = []
+    pos = 0
+    # Start of the next line beginning with '#', or None when there is none
+    start = 0 if body.startswith('#') else body.find('\n#') + 1 or None
+    while start is not None:
+        end = _heading_end(body, start)
+        if end is not None:
+            sections.append(body[pos:start])
+            sections.append(body[start:end])
+            pos = start = end
+        start = body.find('\n#', start) + 1 or None
+    sections.append(body[pos:])
+    return sections
+
+
+@lru_cache(maxsize=2)
+def _get_client(api_key: Optional[str]):
+    """
+    Return a shared Anthropic client for api_key.
+
+    Reusing one client keeps its HTTP connection pool, so later files
+    and translators skip the DNS lookup and TLS handshake. The SDK is
+    imported here rather than at module level because it takes about a
+    second to load and the term-only methods never need it.
+
+    Args:
+        api_key: Anthropic API key
+
+    Returns:
+        anthropic.Anthropic client
+    """
+    import anthropic
+    return anthropic.Anthropic(api_key=api_key)
+
+
 class TranslationAPI:
     """Base class for translation APIs."""
 
@@ -109,12 +566,12 @@ class TranslationAPI:
 class ClaudeTranslation(TranslationAPI):
     """Claude-based translation (primary method)."""
 
-    def __init__(self):
+    def __init__(self, use_cache: bool = True):
+        self.use_cache = use_cache
         try:
-            import anthropic
             api_key = os.getenv('ANTHROPIC_API_KEY')
             if api_key:
-                self.client = anthropic.Anthropic(api_key=api_key)
+                self.client = _get_client(api_key)
                 self.available = True
             else:
                 print("⚠️  ANTHROPIC_API_KEY not found, falling back to term-only translation")
@@ -125,59 +582,191 @@ class ClaudeTranslation(TranslationAPI):
             self.client = None
             self.available = False
 
-    def translate(self, text: str, context: str = "") -> str:
+    def translate(self, text: str, context: str = "", pre_glossaried: bool = False) -> str:
         """
         Translate text using Claude API with terminology glossary.
         Falls back to term replacement if API unavailable.
+
+        Args:
+            text: Text to translate
+            context: Unused, kept for the TranslationAPI signature
+            pre_glossaried: The caller already applied the glossary to text,
+                so a fallback returns text as it is
+
+        Returns:
+            Translated text
         """
         if not self.available or not self.client:
             # Fallback to terminology replacement only
             print("⚠️  Using term-only translation (API unavailable)")
-            result = text
-            terms_sorted = sorted(TERMINOLOGY_GLOSSARY.items(),
-                                key=lambda x: len(x[0]), reverse=True)
-            for en, zh in terms_sorted:
-                pattern = re.compile(r'\b' + re.escape(en) + r'\b', re.IGNORECASE)
-                result = pattern.sub(zh, result)
-            return result
+            return text if pre_glossaried else _apply_glossary(text)
 
-        # Build terminology guide for the prompt
-        glossary_items = list(TERMINOLOGY_GLOSSARY.items())[:50]  # Use top 50 terms
-        glossary_str = "\n".join([f"  - {en}: {zh}" for en, zh in glossary_items])
+        if self.use_cache:
+            cached = _read_cached(text)
+            if cached is not None:
+                return cached
 
-        prompt = f"""You are translating an OECD test guideline document from English to Chinese.
-
-IMPORTANT INSTRUCTIONS:
-1. Translate the FULL text to Chinese - do not leave any English text untranslated
-2. Use the following terminology glossary for consistent scientific translation:
-{glossary_str}
-3. Preserve all markdown formatting, including headings (#, ##, ###), bold (**), italics (*), links, and code blocks
-4. Keep all numeric values, units, chemical formulas, and abbreviations unchanged
-5. Maintain the original document structure and paragraph breaks
-6. For technical terms not in the glossary, use standard Chinese scientific terminology
-
-Text to translate:
+        request = f"""Text to translate:
 {text}
 
 Provide only the Chinese translation without any explanation or notes."""
 
         try:
-            response = self.client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=8192,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            return response.content[0].text.strip()
+            translated, complete = self._complete(request, len(text))
         except Exception as e:
             print(f"⚠️  API translation failed: {e}, falling back to term-only translation")
             # Fallback to terminology replacement only
-            result = text
-            terms_sorted = sorted(TERMINOLOGY_GLOSSARY.items(),
-                                key=lambda x: len(x[0]), reverse=True)
-            for en, zh in terms_sorted:
-                pattern = re.compile(r'\b' + re.escape(en) + r'\b', re.IGNORECASE)
-                result = pattern.sub(zh, result)
-            return result
+            return text if pre_glossaried else _apply_glossary(text)
+
+        # A reply cut off at the token limit is used but never cached,
+        # so a later run asks for it again
+        if not complete:
+            print(f"⚠️  Translation hit the {MAX_OUTPUT_TOKENS}-token limit and may be incomplete")
+        elif self.use_cache:
+            _write_cached(text, translated)
+        return translated
+
+    def _complete(self, request: str, source_chars: int) -> Tuple[str, bool]:
+        """
+        Send one translation request and return the reply text.
+
+        max_tokens is sized to the source text; a reply cut off at that
+        limit is requested again with MAX_OUTPUT_TOKENS. A reply cut off
+        even then is returned as incomplete rather than as a finished
+        translation.
+
+        Args:
+            request: Per-call part of the prompt
+            source_chars: Characters of source text in the request
+
+        Returns:
+            (reply text stripped, whether the reply ended before the token limit)
+        """
+        max_tokens = _max_tokens_for(source_chars)
+        while True:
+            response = self.client.messages.create(
+                model=CLAUDE_MODEL,
+                max_tokens=max_tokens,
+                messages=[{"role": "user", "content": _prompt_content(request)}]
+            )
+            complete = response.stop_reason != "max_tokens"
+            if complete or max_tokens >= MAX_OUTPUT_TOKENS:
+                return response.content[0].text.strip(), complete
+            max_tokens = MAX_OUTPUT_TOKENS
+
+    def translate_batch(self, texts: List[str]) -> List[str]:
+        """
+        Translate several texts with as few API calls as possible.
+
+        Texts longer than BATCH_MAX_CHARS are split at paragraph breaks
+        first. The pieces are sent together as a JSON array, up to
+        BATCH_MAX_CHARS characters per call, with up to
+        MAX_CONCURRENT_REQUESTS batches in flight at once. A batch whose
+        reply cannot be matched back to its pieces is translated one
+        piece at a time instead. Pieces already in the translation cache
+        are not sent.
+
+        Args:
+            texts: Texts to translate
+
+        Returns:
+            Translations, in the same order
+        """
+        if not self.available or not self.client:
+            return [self.translate(text) for text in texts]
+
+        pieces = []
+        owners = []
+        for index, text in enumerate(texts):
+            for piece in _split_for_limit(text, BATCH_MAX_CHARS):
+                pieces.append(piece)
+                owners.append(index)
+
+        results = [[] for _ in texts]
+        for owner, translated in zip(owners, self._translate_pieces(pieces)):
+            results[owner].append(translated)
+        return ['\n\n'.join(parts) for parts in results]
+
+    def _translate_pieces(self, texts: List[str]) -> List[str]:
+        """
+        Translate texts that each fit in one reply, using the cache and
+        concurrent batched calls.
+
+        Args:
+            texts: Texts to translate
+
+        Returns:
+            Translations, in the same order
+        """
+        results = [_read_cached(text) for text in texts] if self.use_cache else [None] * len(texts)
+        missing = [i for i, cached in enumerate(results) if cached is None]
+        batches = _pack_batches([texts[i] for i in missing], BATCH_MAX_CHARS)
+        if not batches:
+            return results
+
+        # The client is thread-safe; map() yields results in batch order
+        translations = []
+        workers = min(MAX_CONCURRENT_REQUESTS, len(batches))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for translated in executor.map(self._translate_packed, batches):
+                translations.extend(translated)
+        for i, translated in zip(missing, translations):
+            results[i] = translated
+        return results
+
+    def _translate_packed(self, batch: List[str]) -> List[str]:
+        """
+        Translate one packed batch, falling back to one call per text.
+
+        Args:
+            batch: Texts to translate together
+
+        Returns:
+            Translations, in the same order
+        """
+        translated = self._translate_json_batch(batch) if len(batch) > 1 else None
+        if translated is None:
+            return [self.translate(text) for text in batch]
+
+        if self.use_cache:
+            for text, item in zip(batch, translated):
+                _write_cached(text, item)
+        return translated
+
+    def _translate_json_batch(self, batch: List[str]) -> Optional[List[str]]:
+        """
+        Translate a batch of texts in one API call.
+
+        Args:
+            batch: Texts to translate together
+
+        Returns:
+            Translations in order, or None if the call or its reply failed
+        """
+        request = f"""The input is a JSON array of text segments; translate each segment on its own and return a JSON array of the translations with the same number of elements, in the same order.
+
+Segments to translate:
+{json.dumps(batch, ensure_ascii=False)}
+
+Provide only the JSON array without any explanation or notes."""
+
+        try:
+            reply, complete = self._complete(request, sum(len(text) for text in batch))
+            translated = json.loads(_CODE_FENCE_RE.sub('', reply))
+        except Exception as e:
+            print(f"⚠️  Batched API translation failed: {e}, translating sections one by one")
+            return None
+
+        # A cut-off reply may still parse, but must not be cached as final
+        if not complete:
+            print("⚠️  Batched reply hit the token limit, translating sections one by one")
+            return None
+
+        if (not isinstance(translated, list) or len(translated) != len(batch)
+                or not all(isinstance(item, str) for item in translated)):
+            print("⚠️  Batched reply did not match the request, translating sections one by one")
+            return None
+        return [item.strip() for item in translated]
 
 
 class AnthropicAPITranslation(TranslationAPI):
@@ -185,8 +774,7 @@ class AnthropicAPITranslation(TranslationAPI):
 
     def __init__(self, api_key: Optional[str] = None):
         try:
-            import anthropic
-            self.client = anthropic.Anthropic(api_key=api_key or os.getenv('ANTHROPIC_API_KEY'))
+            self.client = _get_client(api_key or os.getenv('ANTHROPIC_API_KEY'))
             self.available = True
         except Exception as e:
             print(f"Anthropic API not available: {e}")
@@ -197,12 +785,10 @@ class AnthropicAPITranslation(TranslationAPI):
             raise RuntimeError("Anthropic API not available")
 
         # Build prompt with terminology
-        glossary_str = "\n".join([f"{en}: {zh}" for en, zh in list(TERMINOLOGY_GLOSSARY.items())[:20]])
-
         prompt = f"""Translate the following text from English to Chinese. Use accurate scientific terminology for toxicology and experimental methods.
 
 Key terminology:
-{glossary_str}
+{_GLOSSARY_STR_20}
 
 Text to translate:
 {text}
@@ -218,8 +804,24 @@ Provide only the Chinese translation without explanation."""
         return response.content[0].text
 
 
+def _write_qmd(output_qmd: str, frontmatter: str, body_parts: List[str]) -> None:
+    """
+    Write a QMD file piece by piece, without joining it into one string first.
+
+    Args:
+        output_qmd: Output file path
+        frontmatter: Frontmatter text between the '---' markers
+        body_parts: Body text, in order
+    """
+    with open(output_qmd, 'w', encoding='utf-8') as f:
+        f.write("---\n")
+        f.write(frontmatter)
+        f.write("---\n")
+        f.writelines(body_parts)
+
+
 def translate_qmd_file(input_qmd: str, output_qmd: str,
-                      method: str = "claude") -> None:
+                      method: str = "claude", use_cache: bool = True) -> None:
     """
     Translate QMD file from English to Chinese.
 
@@ -231,15 +833,18 @@ def translate_qmd_file(input_qmd: str, output_qmd: str,
                    - 'claude': Uses Anthropic API if available, otherwise term-only
                    - 'anthropic': Uses Anthropic API directly
                    - Other methods use their respective APIs
+        use_cache: Reuse and store API translations in TRANSLATION_CACHE_DIR
     """
     with open(input_qmd, 'r', encoding='utf-8') as f:
         content = f.read()
 
-    # Split into frontmatter and body
-    parts = content.split('---', 2)
-    if len(parts) >= 3:
-        frontmatter = parts[1]
-        body = parts[2]
+    # Split into frontmatter and body at the first two '---' markers,
+    # slicing once instead of building a list of pieces
+    first = content.find('---')
+    second = content.find('---', first + 3) if first != -1 else -1
+    if second != -1:
+        frontmatter = content[first + 3:second]
+        body = content[second + 3:]
     else:
         frontmatter = ""
         body = content
@@ -247,34 +852,26 @@ def translate_qmd_file(input_qmd: str, output_qmd: str,
     if method == "claude-code":
         # Create a translation request file for Claude Code interactive processing
         print("📝 Creating Claude Code translation request...")
-        result = body
 
         # Apply terminology glossary first as base
-        terms_sorted = sorted(TERMINOLOGY_GLOSSARY.items(),
-                            key=lambda x: len(x[0]), reverse=True)
-
-        for en, zh in terms_sorted:
-            pattern = re.compile(r'\b' + re.escape(en) + r'\b', re.IGNORECASE)
-            result = pattern.sub(zh, result)
+        result = _apply_glossary(body)
 
         # Update frontmatter for Chinese version
         translated_frontmatter = translate_frontmatter(frontmatter)
 
         # Combine with term-replacement as base
-        translated_content = f"---\n{translated_frontmatter}---\n{result}"
-
-        with open(output_qmd, 'w', encoding='utf-8') as f:
-            f.write(translated_content)
+        _write_qmd(output_qmd, translated_frontmatter, [result])
 
         # Create a companion file requesting full translation
-        request_file = output_qmd.replace('.qmd', '_translation_request.txt')
+        output_path = Path(output_qmd)
+        request_file = str(output_path.with_name(f"{output_path.stem}_translation_request.txt"))
         with open(request_file, 'w', encoding='utf-8') as f:
             f.write(f"""CLAUDE CODE TRANSLATION REQUEST
 ================================
 
 Input file: {input_qmd}
 Output file: {output_qmd}
-Created: {__import__('datetime').datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+Created: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 INSTRUCTIONS FOR CLAUDE CODE:
 1. Read the input QMD file: {input_qmd}
@@ -307,106 +904,84 @@ Key terminology to use:
 
     if method == "claude":
         # Create a translation instruction file for Claude Code
-        translator = ClaudeTranslation()
-
         # Apply terminology glossary first (preserves formatting)
         print("📝 Applying terminology glossary...")
-        result = body
-
-        # Sort by length (longer terms first to avoid partial matches)
-        terms_sorted = sorted(TERMINOLOGY_GLOSSARY.items(),
-                            key=lambda x: len(x[0]), reverse=True)
 
-        for en, zh in terms_sorted:
-            # Preserve case sensitivity
-            pattern = re.compile(r'\b' + re.escape(en) + r'\b', re.IGNORECASE)
-            result = pattern.sub(zh, result)
+        # Longer terms take precedence to avoid partial matches
+        result = _apply_glossary(body)
 
         # Update frontmatter for Chinese version
         translated_frontmatter = translate_frontmatter(frontmatter)
 
         # Combine
-        translated_content = f"---\n{translated_frontmatter}---\n{result}"
-
-        with open(output_qmd, 'w', encoding='utf-8') as f:
-            f.write(translated_content)
+        _write_qmd(output_qmd, translated_frontmatter, [result])
 
         print(f"✅ Terminology-based translation complete: {output_qmd}")
         print("⚠️  Note: Full translation requires Claude Code to process this file")
         print("   The file has been created with terminology replacements applied.")
     else:
         # Use API-based translation
-        translator = ClaudeTranslation()
+        translator = ClaudeTranslation(use_cache=use_cache)
 
         # Translate body section by section
         # Split by headings to translate in chunks
-        sections = re.split(r'(^#{1,6}\s+.+$)', body, flags=re.MULTILINE)
-
-        translated_sections = []
-        for i, section in enumerate(sections):
-            if section.startswith('#'):
-                # Keep heading markers
-                translated_sections.append(section)
-            elif section.strip():
-                # Translate content
-                translated = translator.translate(section)
-                translated_sections.append(translated)
-            else:
-                translated_sections.append(section)
+        sections = _split_sections(body)
+
+        # Keep headings and blank sections; translate the rest in batches
+        to_translate = [i for i, section in enumerate(sections)
+                        if not section.startswith('#') and section.strip()]
+        translations = translator.translate_batch([sections[i] for i in to_translate])
 
-        translated_body = ''.join(translated_sections)
+        translated_sections = list(sections)
+        for i, translated in zip(to_translate, translations):
+            translated_sections[i] = translated
 
         # Update frontmatter for Chinese version
         translated_frontmatter = translate_frontmatter(frontmatter)
 
-        # Combine
-        translated_content = f"---\n{translated_frontmatter}---\n{translated_body}"
-
-        with open(output_qmd, 'w', encoding='utf-8') as f:
-            f.write(translated_content)
+        # Combine, writing the sections without joining the body
+        _write_qmd(output_qmd, translated_frontmatter, translated_sections)
 
         print(f"✅ Translation complete: {output_qmd}")
 
 
 def translate_frontmatter(frontmatter: str) -> str:
-    """Translate frontmatter fields to Chinese."""
-    lines = []
-    for line in frontmatter.split('\n'):
-        if 'title:' in line and 'OECD测试指南' not in line:
-            # Keep Chinese title as is
-            lines.append(line)
-        elif 'description:' in line:
-            lines.append(line)
-        elif 'keywords:' in line:
-            lines.append(line)
-        else:
-            lines.append(line)
-    return '\n'.join(lines)
+    """
+    Translate frontmatter fields to Chinese.
+
+    The title, description and keywords are kept as they are, so the
+    frontmatter is currently returned unchanged.
+    """
+    return frontmatter
 
 
 def main():
     """Main entry point."""
-    if len(sys.argv) < 2:
-        print("Usage: python translate_qmd.py <input_qmd> [output_qmd] [method]")
+    use_cache = '--no-cache' not in sys.argv
+    args = [arg for arg in sys.argv[1:] if arg != '--no-cache']
+
+    if len(args) < 1:
+        print("Usage: python translate_qmd.py <input_qmd> [output_qmd] [method] [--no-cache]")
         print("Methods: claude (default), anthropic, openai, deepseek, qwen, etc.")
+        print("--no-cache: Do not reuse or store API translations in ~/.cache/oecd-translate")
         sys.exit(1)
 
-    input_qmd = sys.argv[1]
+    input_qmd = args[0]
 
-    if len(sys.argv) >= 3:
-        output_qmd = sys.argv[2]
+    if len(args) >= 2:
+        output_qmd = args[1]
     else:
         # Auto-generate output filename
         input_path = Path(input_qmd)
         output_qmd = str(input_path.parent / f"{input_path.stem}_中文{input_path.suffix}")
 
-    method = sys.argv[3] if len(sys.argv) >= 4 else "claude"
+    method = args[2] if len(args) >= 3 else "claude"
 
     print(f"Translating: {input_qmd}")
     print(f"Method: {method}")
     print(f"Output: {output_qmd}\n")
 
-    translate_qmd_file(input_qmd, output_qmd, method)
+    translate_qmd_file(input_qmd, output_qmd, method, use_cache=use_cache)
 
     print("\n📝 Translation notes:")
     print("   - Applied toxicology terminology glossary")